@@ -22,10 +22,11 @@ def substituteAndWrite(template, target, mapping):
     """substitute content from template and write to target"""
     if not os.path.exists(template):
         sys.exit("Template file '" + template + "' could not be found")
+    with open(template) as tmp:
+        raw = string.Template(tmp.read())
+    content = raw.substitute(mapping)
     with open(target, "w") as targetFile:
-        with open(template) as tmp:
-            raw = string.Template(tmp.read())
-            targetFile.write(raw.substitute(**mapping))
+        targetFile.write(content)
 
 
 if __name__ == "__main__":
@@ -7,9 +7,14 @@ for usage of getParam or getParamFromGroup.
 
 import os
 import argparse
+import hashlib
 import json
 import logging
+import multiprocessing
+import re
 import sys
+from collections import defaultdict
+from itertools import groupby
 
 
 class CheckExistAction(argparse.Action):
@@ -67,6 +72,21 @@ argumentParser.add_argument(
         "../../doc/doxygen/extradoc/known_parameter_warnings.json",
     ),
 )
+argumentParser.add_argument(
+    "--num-processes",
+    help="number of processes used to scan the header files (default: 1)",
+    metavar="numProcesses",
+    dest="numProcesses",
+    type=int,
+    default=1,
+)
+argumentParser.add_argument(
+    "--cache",
+    help="json file caching the scan results per header file (unchanged files are not rescanned)",
+    metavar="cacheFile",
+    dest="cacheFile",
+    default=None,
+)
 cmdArgs = vars(argumentParser.parse_args())
 
 # setup a logger
@@ -128,11 +148,23 @@ def getEnclosedContent(string, openKey, closeKey):
     return result.partition(openKey)[2].rpartition(closeKey)[0]
 
 
-def extractParameterName(line):
-    """extract a parameter from a given line"""
+# matches getParam<T>(CALLARGS) and getParamFromGroup<T>(CALLARGS) if neither
+# the template argument T nor the function arguments CALLARGS contain brackets
+PARAM_CALL_REGEX = re.compile(r"getParam(FromGroup)?<([^<>]*)>\s*\(([^()]*)\)")
 
-    # split occurrences of getParam<T>(CALLARGS) or getParamFromGroup<T>(CALLARGS)
-    # into the template arguments T and the function arguments CALLARGS
+
+def splitParameterCall(line):
+    """split a call getParam<T>(CALLARGS) or getParamFromGroup<T>(CALLARGS) in the given line
+    into the group prefix flag, the template args T and the function arguments CALLARGS"""
+
+    # fast path for lines with a single call without nested brackets
+    if line.count("getParam") == 1:
+        match = PARAM_CALL_REGEX.search(line)
+        if match and ";" not in match.group(0):
+            return match.group(1) is not None, match.group(2), match.group(3)
+
+    # fall back to matching pairs of brackets for nested template/function arguments
+    # (for multiple occurrences in one line, getParamFromGroup takes precedence)
     if "getParamFromGroup<" in line:
         line = line.split("getParamFromGroup")[1]
         hasGroupPrefix = True
@@ -140,7 +172,7 @@ def extractParameterName(line):
         line = line.split("getParam")[1]
         hasGroupPrefix = False
     else:
-        return {}
+        return None
 
     # this is a current limitation (fix this if it starts to occur)
     if line.count("getParam") > 1:
@@ -156,6 +188,20 @@ def extractParameterName(line):
     functionArgs = line.partition("<" + paramType + ">")[2]
     functionArgs = getEnclosedContent(functionArgs, "(", ")")
 
+    return hasGroupPrefix, paramType, functionArgs
+
+
+def extractParameterName(line):
+    """extract a parameter from a given line"""
+
+    if "getParam" not in line:
+        return {}
+
+    parameterCall = splitParameterCall(line)
+    if parameterCall is None:
+        return {}
+    hasGroupPrefix, paramType, functionArgs = parameterCall
+
     if hasGroupPrefix:
         functionArgs = functionArgs.partition(",")[2]
     functionArgs = functionArgs.partition(",")
@@ -186,38 +232,81 @@ with open(cmdArgs["warningInput"]) as f:
 
 
 def getParameterListFromFile(fileName):
-    """extract all parameters from a given file"""
+    """extract all parameters from a given file
+    and return them together with the errors per line number"""
     parameterList = []
     errors = {}
-    with open(fileName) as paramsFile:
-        for lineIdx, line in enumerate(paramsFile):
-            try:
-                param = extractParameterName(line)
-                if param:
-                    parameterList.append(param)
-            except IOError as exc:
-                errors[lineIdx + 1] = {"line": line.strip(), "message": exc}
-
-    # print encountered errors
-    if errors:
-        # remove the known warnings
-        for lineIdx in list(errors.keys()):
-            searchKey = os.path.relpath(fileName, cmdArgs["root"])
-            if searchKey in warningDict:
-                if errors[lineIdx]["line"] in warningDict[searchKey]:
-                    errors.pop(lineIdx)
-
-        if len(errors) > 0:
-            logger.warning(
-                f"{len(errors)} parameter(s) in file {fileName}"
-                " could not be retrieved automatically."
-                " Please check them..."
-            )
-        for lineIdx, errorInfo in errors.items():
-            logger.warning(f"\t-> line {lineIdx}: {errorInfo['line']}")
-            logger.warning(f"\t\t-> error message: {errorInfo['message']}")
+    # read the raw bytes to avoid decoding the entire file
+    with open(fileName, "rb") as paramsFile:
+        content = paramsFile.read()
+
+    # only look at (and decode) the few lines mentioning getParam
+    # and determine line numbers only for error reporting
+    pos = content.find(b"getParam")
+    while pos != -1:
+        lineStart = content.rfind(b"\n", 0, pos) + 1
+        lineEnd = content.find(b"\n", pos)
+        if lineEnd == -1:
+            lineEnd = len(content)
+        line = content[lineStart:lineEnd].decode()
+        try:
+            param = extractParameterName(line)
+            if param:
+                parameterList.append(param)
+        except IOError as exc:
+            lineIdx = content.count(b"\n", 0, lineStart)
+            errors[lineIdx + 1] = {"line": line.strip(), "message": str(exc)}
+        pos = content.find(b"getParam", lineEnd)
+
+    return parameterList, errors
+
+
+def logParameterErrors(fileName, errors):
+    """print the errors encountered in a given file (except for the known warnings)"""
+
+    # remove the known warnings
+    for lineIdx in list(errors.keys()):
+        searchKey = os.path.relpath(fileName, cmdArgs["root"])
+        if searchKey in warningDict:
+            if errors[lineIdx]["line"] in warningDict[searchKey]:
+                errors.pop(lineIdx)
+
+    if len(errors) > 0:
+        logger.warning(
+            f"{len(errors)} parameter(s) in file {fileName}"
+            " could not be retrieved automatically."
+            " Please check them..."
+        )
+    for lineIdx, errorInfo in errors.items():
+        logger.warning(f"\t-> line {lineIdx}: {errorInfo['line']}")
+        logger.warning(f"\t\t-> error message: {errorInfo['message']}")
+
+
+# folders not to descend into: tests, examples, and VCS/build/cache folders
+SKIPPED_FOLDERS = frozenset({"test", "examples", ".git", "CMakeFiles", "__pycache__"})
+
 
-    return parameterList
+def isSkippedFolder(folderName):
+    """whether the folder with the given name should not be searched"""
+    return folderName in SKIPPED_FOLDERS or folderName.startswith(("build", "."))
+
+
+def walkHeaderFiles(directory):
+    """yield the paths of all header files below the given directory
+    (skipping parameters.hh and the folders above) in top-down order"""
+    stack = [directory]
+    while stack:
+        subDirs = []
+        with os.scandir(stack.pop()) as entries:
+            for dirEntry in entries:
+                if dirEntry.is_dir(follow_symlinks=False):
+                    if not isSkippedFolder(dirEntry.name):
+                        subDirs.append(dirEntry.path)
+                elif dirEntry.is_file(follow_symlinks=False) and dirEntry.name.endswith(".hh"):
+                    if dirEntry.name != "parameters.hh":
+                        yield dirEntry.path
+        # visit the sub-directories in the order they were found
+        stack.extend(reversed(subDirs))
 
 
 # search all *.hh files for parameters
@@ -225,25 +314,112 @@ logger.info("Searching for parameters in the source file tree")
 logger.info("--------------------------------------------------------------------------------")
 parameters = []
 rootDir = cmdArgs["root"]
-for root, dirs, files in os.walk(rootDir):
-    dirs[:] = [d for d in dirs if d not in ("test", "examples")]
-    for file in files:
-        if os.path.splitext(file)[1] == ".hh" and os.path.splitext(file)[0] != "parameters":
-            parameters.extend(getParameterListFromFile(os.path.join(root, file)))
+headerFiles = list(walkHeaderFiles(rootDir))
+
+# reuse the results for header files that are unchanged (same mtime and size)
+# since the cache was written and only scan the remaining ones
+# (the cache is only valid for the version of this script that wrote it)
+with open(__file__, "rb") as scriptFile:
+    SCAN_CACHE_VERSION = hashlib.sha256(scriptFile.read()).hexdigest()
+
+
+def loadScanCache(fileName):
+    """load the cached scan results per file (empty if the cache
+    does not exist, is malformed or stems from another script version)"""
+    if not fileName or not os.path.isfile(fileName):
+        return {}
+    try:
+        with open(fileName) as jsonFile:
+            cache = json.load(jsonFile)
+    except (OSError, ValueError) as exc:
+        logger.info(f"Ignoring unreadable scan cache {fileName}: {exc}")
+        return {}
+    if not isinstance(cache, dict) or not isinstance(cache.get("files"), dict):
+        logger.info(f"Ignoring malformed scan cache {fileName}")
+        return {}
+    if cache.get("version") != SCAN_CACHE_VERSION:
+        logger.info(f"Ignoring scan cache {fileName} written by another version of this script")
+        return {}
+    return cache["files"]
+
+
+def isValidCacheEntry(cached, stamp):
+    """whether a cache entry is well-formed and matches the given file stamp"""
+    if not isinstance(cached, dict) or cached.get("stamp") != stamp:
+        return False
+    if not isinstance(cached.get("parameters"), list) or not isinstance(cached.get("errors"), dict):
+        return False
+    return all(lineIdx.isdigit() for lineIdx in cached["errors"])
+
+
+def fileStamp(fileName):
+    """the modification time and size of the given file"""
+    stat = os.stat(fileName)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+# (only stat the header files if a cache is used)
+if cmdArgs["cacheFile"]:
+    scanCache = loadScanCache(cmdArgs["cacheFile"])
+    headerKeys = {path: os.path.relpath(path, rootDir) for path in headerFiles}
+    headerStamps = {headerKeys[path]: fileStamp(path) for path in headerFiles}
+    filesToScan = [
+        path
+        for path, key in headerKeys.items()
+        if not isValidCacheEntry(scanCache.get(key), headerStamps[key])
+    ]
+    logger.debug(f"Reusing cached results for {len(headerFiles) - len(filesToScan)} files")
+else:
+    scanCache = {}
+    headerKeys = {path: path for path in headerFiles}
+    headerStamps = {}
+    filesToScan = headerFiles
+
+# This script runs at module level, so worker processes have to be forked
+# (a spawned process would re-run the entire script). Scan serially otherwise.
+numProcesses = max(1, cmdArgs["numProcesses"])
+if numProcesses > 1 and "fork" in multiprocessing.get_all_start_methods():
+    with multiprocessing.get_context("fork").Pool(processes=numProcesses) as pool:
+        results = pool.map(getParameterListFromFile, filesToScan, chunksize=64)
+else:
+    results = map(getParameterListFromFile, filesToScan)
+
+for path, (params, scanErrors) in zip(filesToScan, results):
+    scanCache[headerKeys[path]] = {
+        "stamp": headerStamps.get(headerKeys[path]),
+        "parameters": params,
+        "errors": scanErrors,
+    }
+
+for path in headerFiles:
+    cacheEntry = scanCache[headerKeys[path]]
+    parameters.extend(cacheEntry["parameters"])
+    if cacheEntry["errors"]:
+        # json stores the line numbers as strings
+        logParameterErrors(path, {int(k): v for k, v in cacheEntry["errors"].items()})
+
+# write the cache via a temporary file such that an interrupted run keeps the old cache
+if cmdArgs["cacheFile"]:
+    with open(cmdArgs["cacheFile"] + ".tmp", "w") as f:
+        json.dump(
+            {
+                "version": SCAN_CACHE_VERSION,
+                "files": {key: scanCache[key] for key in headerStamps},
+            },
+            f,
+        )
+    os.replace(cmdArgs["cacheFile"] + ".tmp", cmdArgs["cacheFile"])
 logger.info("--------------------------------------------------------------------------------")
 
 # make sorted dictionary of the entries
 # treat duplicates (could have differing default values or type names - e.g. via aliases)
-parameterDict = {}
+parameterDict = defaultdict(lambda: {"paramName": None, "paramType": [], "defaultValue": []})
 for params in parameters:
-    key = params["paramName"]
-    if key in parameterDict:
-        parameterDict[key]["defaultValue"].append(params["defaultValue"])
-        parameterDict[key]["paramType"].append(params["paramType"])
-    else:
-        parameterDict[key] = params
-        parameterDict[key]["defaultValue"] = [params["defaultValue"]]
-        parameterDict[key]["paramType"] = [params["paramType"]]
+    entry = parameterDict[params["paramName"]]
+    entry["paramName"] = params["paramName"]
+    entry["paramType"].append(params["paramType"])
+    entry["defaultValue"].append(params["defaultValue"])
+parameterDict = dict(parameterDict)
 
 # get the explanations from current parameter json file
 inputDict = {}
@@ -274,7 +450,7 @@ for missingKey in missingParameters:
 
     else:
         logger.error(
-            f"Found parameter '{key}' in {cmdArgs['inputFile']}"
+            f"Found parameter '{missingKey}' in {cmdArgs['inputFile']}"
             f" which has not been found in the code "
             "--> Set mode to 'manual' in the input file if it is to be kept otherwise delete it!"
         )
@@ -287,9 +463,9 @@ tableEntryData = []
 for key in parameterDict:
 
     entry = parameterDict[key]
-    hasGroup = entry["paramName"].count(".") > 0
-    group = "-" if not hasGroup else entry["paramName"].split(".")[0]
-    parameter = entry["paramName"] if not hasGroup else entry["paramName"].partition(".")[2]
+    group, separator, parameter = entry["paramName"].partition(".")
+    if not separator:
+        group, parameter = "-", entry["paramName"]
 
     # In case of multiple occurrences,
     # we prefer the default value from input
@@ -385,7 +561,6 @@ for key in parameterDict:
 # generate actual table entries
 tableEntriesWithGroup = []
 tableEntriesWithoutGroup = []
-PREVIOUS_GROUP_ENTRY = None
 
 GROUP_ENTRY_LENGTH = 20
 PARAM_NAME_LENGTH = 45
@@ -406,30 +581,28 @@ def tableEntry(groupEntry, param, paramTypeName, defaultParamValue, explanation)
     )
 
 
-for data in tableEntryData:
+for group, groupData in groupby(tableEntryData, key=lambda data: data["group"]):
+    groupTableEntries = tableEntriesWithoutGroup if group == "-" else tableEntriesWithGroup
+    for entryIdx, data in enumerate(groupData):
 
-    groupName = data["group"]
-    if groupName != PREVIOUS_GROUP_ENTRY:
-        PREVIOUS_GROUP_ENTRY = groupName
-        if groupName != "-":
-            groupName = "\\b " + groupName
+        # the first entry of a group is printed in bold
+        groupName = "\\b " + group if entryIdx == 0 and group != "-" else group
 
-    if len(data["explanation"].strip()) == 0:
-        logger.error(
-            f"Parameter {groupName}.{data['name']} has no explanation. Add it to the input file!"
-        )
+        if len(data["explanation"].strip()) == 0:
+            logger.error(
+                f"Parameter {groupName}.{data['name']} has no explanation."
+                " Add it to the input file!"
+            )
 
-    TABLE_ENTRY = tableEntry(
-        groupEntry=groupName,
-        param=data["name"],
-        paramTypeName=data["type"],
-        defaultParamValue=data["default"],
-        explanation=data["explanation"],
-    )
-    if groupName != "-":
-        tableEntriesWithGroup.append(TABLE_ENTRY)
-    else:
-        tableEntriesWithoutGroup.append(TABLE_ENTRY)
+        groupTableEntries.append(
+            tableEntry(
+                groupEntry=groupName,
+                param=data["name"],
+                paramTypeName=data["type"],
+                defaultParamValue=data["default"],
+                explanation=data["explanation"],
+            )
+        )
 
 # combine entries
 tableEntries = tableEntriesWithGroup + tableEntriesWithoutGroup
@@ -474,11 +647,11 @@ PARAMETER_FILE_NAME = os.path.join(rootDir, cmdArgs["output"])
 logger.info("--------------------------------------------------------------------------------")
 logger.info(f"Overwriting parameter file in {PARAMETER_FILE_NAME}")
 logger.info("--------------------------------------------------------------------------------")
-with open(PARAMETER_FILE_NAME, "w") as outputfile:
-    outputfile.write(HEADER)
-    for e in tableEntries:
-        outputfile.write(e + "\n")
-    outputfile.write(" */\n")
+# write to a temporary file first and then (atomically) replace the old file
+# such that an aborted run never leaves behind a partially written list
+with open(PARAMETER_FILE_NAME + ".tmp", "w") as outputfile:
+    outputfile.write(HEADER + "".join(f"{e}\n" for e in tableEntries) + " */\n")
+os.replace(PARAMETER_FILE_NAME + ".tmp", PARAMETER_FILE_NAME)
 
 if logger.error.counter > 0:
     print("Finished with errors! Check log file!")
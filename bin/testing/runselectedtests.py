@@ -6,16 +6,46 @@ Run this in the top level of the build tree.
 """
 
 import os
+import re
 import sys
 import json
 import subprocess
 from argparse import ArgumentParser
+from itertools import chain
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # require Python 3
 if sys.version_info.major < 3:
     sys.exit("Python 3 required")
 
 
+def loadConfig(fileName):
+    """Read the test configuration (uses the faster orjson parser if available)"""
+    if orjson is not None:
+        with open(fileName, "rb") as configFile:
+            return orjson.loads(configFile.read())
+
+    with open(fileName) as configFile:
+        return json.load(configFile)
+
+
+def runCommand(command):
+    """Run a command that writes directly to our stdout/stderr and exit if it fails"""
+
+    # flush our own (possibly block-buffered) output first such that
+    # it appears in the log before the output of the command
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with subprocess.Popen(command) as process:
+        returnCode = process.wait()
+    if returnCode:
+        sys.exit(returnCode)
+
+
 def buildTests(config, flags=None):
     """Compile the test suite"""
 
@@ -30,15 +60,13 @@ def buildTests(config, flags=None):
     # is taken care of within that latter Makefile. Therefore, we create a
     # small custom Makefile here on top of `Makefile2`, where we define a new
     # target, composed of affected tests, that can be built in parallel
+    targets = " ".join(tc["target"] for tc in config.values())
     with open("TestMakeFile", "w") as makeFile:
-        # include make file generated by cmake
-        makeFile.write("include CMakeFiles/Makefile2\n")
-
-        # define a new target composed of the test targets
-        makeFile.write("testselection: ")
-        makeFile.write(" ".join([tc["target"] for tc in config.values()]))
+        # include make file generated by cmake and define
+        # a new target composed of the test targets
+        makeFile.write(f"include CMakeFiles/Makefile2\ntestselection: {targets}")
 
-    subprocess.run(["make", "-f", "TestMakeFile"] + flags + ["testselection"], check=True)
+    runCommand(["make", "-f", "TestMakeFile"] + flags + ["testselection"])
 
 
 def runTests(config, script="", flags=None):
@@ -51,12 +79,11 @@ def runTests(config, script="", flags=None):
         print("No tests to be run. Letting dune-ctest produce empty report.")
         tests = ["NOOP"]
 
-    # turn test names into a regular expression
-    testRegEx = "|".join([f"^{t}$" for t in tests])
+    # turn test names into a single anchored regular expression
+    testRegEx = "^(" + "|".join(re.escape(t) for t in tests) + ")$"
 
     # if not given, try system-wide call to dune-ctest
-    script = ["dune-ctest"] if not script else script
-    subprocess.run([script] + flags + ["-R", testRegEx], check=True)
+    runCommand(list(chain([script or "dune-ctest"], flags, ["-R", testRegEx])))
 
 
 if __name__ == "__main__":
@@ -122,19 +149,18 @@ if __name__ == "__main__":
     if args["all"]:
         if args["build"]:
             print("Building all tests")
-            subprocess.run(["make"] + buildFlags + ["build_tests"], check=True)
+            runCommand(["make"] + buildFlags + ["build_tests"])
         if args["test"]:
             print("Running all tests")
-            subprocess.run([dunectest] + testFlags, check=True)
+            runCommand([dunectest] + testFlags)
 
     # use target selection
     else:
-        with open(args["config"]) as configFile:
-            configDict = json.load(configFile)
-            numTests = len(configDict)
-            print(f"{numTests} tests found in the configuration file")
-
-            if args["build"]:
-                buildTests(configDict, buildFlags)
-            if args["test"]:
-                runTests(configDict, dunectest, testFlags)
+        configDict = loadConfig(args["config"])
+        numTests = len(configDict)
+        print(f"{numTests} tests found in the configuration file")
+
+        if args["build"]:
+            buildTests(configDict, buildFlags)
+        if args["test"]:
+            runTests(configDict, dunectest, testFlags)